@@ -1,3 +1,9 @@
+import logging
+
 from .pvoutput import *
 
 __version__ = 0.1
+
+# Library code shouldn't log anywhere unless the user asks it to.
+# See pvoutput.utils.get_logger().
+logging.getLogger('pvoutput').addHandler(logging.NullHandler())
@@ -283,6 +283,7 @@ PV_OUTPUT_MAP_COLUMN_NAMES = {
 ONE_DAY = timedelta(days=1)
 
 PV_OUTPUT_DATE_FORMAT = "%Y%m%d"
+PV_OUTPUT_DATETIME_FORMAT = PV_OUTPUT_DATE_FORMAT + " %H:%M"
 CONFIG_FILENAME = os.path.expanduser("~/.pvoutput.yml")
 RATE_LIMIT_PARAMS_TO_API_HEADERS = {
     'rate_limit_remaining': 'X-Rate-Limit-Remaining',
@@ -1,10 +1,17 @@
 import warnings
-import os
-from io import StringIO
+import asyncio
+import sys
+import threading
+import functools
+import itertools
+from io import StringIO, BytesIO
 import time
 import logging
-from typing import Dict, Union, Optional, Iterable, List
+import re
+from typing import Dict, Union, Optional, Iterable, List, Tuple
+from typing import Iterator, AsyncIterator, Callable, Awaitable
 from datetime import datetime, timedelta, date
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import tables
 import numpy as np
@@ -12,9 +19,12 @@ import pandas as pd
 
 from pvoutput.exceptions import NoStatusFound, RateLimitExceeded
 from pvoutput.utils import _get_response, _get_param_from_config_file
+from pvoutput.utils import _get_response_async, _get_aiohttp_session
+from pvoutput.utils import _get_api_url
 from pvoutput.utils import _print_and_log, get_date_ranges_to_download
 from pvoutput.utils import system_id_to_hdf_key, sort_and_de_dupe_pv_system
 from pvoutput.consts import ONE_DAY, PV_OUTPUT_DATE_FORMAT, BASE_URL
+from pvoutput.consts import PV_OUTPUT_DATETIME_FORMAT
 from pvoutput.consts import CONFIG_FILENAME, RATE_LIMIT_PARAMS_TO_API_HEADERS
 from pvoutput.daterange import DateRange, merge_date_ranges_to_years
 
@@ -53,8 +63,11 @@ class PVOutput:
         self.system_id = system_id
         self.rate_limit_remaining = None
         self.rate_limit_total = None
-        self.rate_limit_reset_time = None
+        # Seconds since the epoch.  Converted to pd.Timestamp on demand by
+        # the rate_limit_reset_time property.
+        self._rate_limit_reset_timestamp = None
         self.data_service_url = data_service_url
+        self._rate_controller = _RateController()
 
         # Set from config file if None
         for param_name in ['api_key', 'system_id']:
@@ -137,11 +150,12 @@ class PVOutput:
         if lat is not None and lon is not None:
             api_params['ll'] = '{:f},{:f}'.format(lat, lon)
 
-        pv_systems_text = self._api_query(
-            service='search', api_params=api_params, **kwargs)
+        pv_systems_content = self._api_query(
+            service='search', api_params=api_params, decode=False, **kwargs)
 
         pv_systems = pd.read_csv(
-            StringIO(pv_systems_text),
+            BytesIO(pv_systems_content),
+            encoding='latin1',
             names=[
                 'name',
                 'system_AC_capacity_W',
@@ -162,6 +176,8 @@ class PVOutput:
     def get_status(self,
                    pv_system_id: int,
                    date: Union[str, datetime],
+                   fast_parse: bool = True,
+                   dtype=np.float32,
                    **kwargs
                    ) -> pd.DataFrame:
         """Get PV system status (e.g. power generation) for one day.
@@ -173,11 +189,15 @@ class PVOutput:
             pv_system_id: int
             date: str in format YYYYMMDD; or datetime
                 (localtime of the PV system)
+            fast_parse: bool, if True then try a specialised parser for the
+                getstatus response before falling back to pd.read_csv.
+            dtype: numpy dtype of the columns.  Use np.float64 if the values
+                must match the decimal values sent by PVOutput.org exactly.
 
         Returns:
             pd.DataFrame:
                 index: datetime (DatetimeIndex, localtime of the PV system)
-                columns:  (all np.float64):
+                columns:  (all `dtype`):
                     cumulative_energy_gen_Wh,
                     energy_efficiency_kWh_per_kW,
                     instantaneous_power_gen_W,
@@ -188,54 +208,282 @@ class PVOutput:
                     temperature_C,
                     voltage
         """
-        _LOG.info(
-            "system_id %d: Requesting system status for %s",
-            pv_system_id, date)
-        date = date_to_pvoutput_str(date)
-        _check_date(date)
-
-        api_params = {
-            'd': date,  # date, YYYYMMDD, localtime of the PV system
-            'h': 1,  # We want historical data.
-            'limit': 288,  # API limit is 288 (num of 5-min periods per day).
-            'ext': 0,  # Extended data; we don't want extended data.
-            'sid1': pv_system_id  # SystemID.
-        }
+        return _process_status(
+            self._get_status_content(pv_system_id, date, **kwargs),
+            fast_parse=fast_parse, dtype=dtype)
+
+    def _get_status_content(self,
+                            pv_system_id: int,
+                            date: Union[str, datetime],
+                            **kwargs
+                            ) -> bytes:
+        """Returns the raw content of the getstatus API response."""
+        api_params = _get_status_api_params(pv_system_id, date)
 
         try:
-            pv_system_status_text = self._api_query(
-                service='getstatus', api_params=api_params, **kwargs)
+            return self._api_query(
+                service='getstatus', api_params=api_params, decode=False,
+                **kwargs)
         except NoStatusFound:
             _LOG.info(
                 'system_id %d: No status found for date %s',
-                pv_system_id, date)
-            pv_system_status_text = ""
-
-        # See https://pvoutput.org/help.html#api-getstatus but make sure
-        # you read the 'History Query' subsection, as a historical query
-        # has slightly different return columns compared to a non-historical
-        # query!
-        columns = [
-            'cumulative_energy_gen_Wh',
-            'energy_efficiency_kWh_per_kW',
-            'instantaneous_power_gen_W',
-            'average_power_gen_W',
-            'power_gen_normalised',
-            'energy_consumption_Wh',
-            'power_demand_W',
-            'temperature_C',
-            'voltage']
-
-        pv_system_status = pd.read_csv(
-            StringIO(pv_system_status_text),
-            lineterminator=';',
-            names=['date', 'time'] + columns,
-            parse_dates={'datetime': ['date', 'time']},
-            index_col=['datetime'],
-            dtype={col: np.float64 for col in columns}
-        ).sort_index()
+                pv_system_id, api_params['d'])
+            return b""
+
+    def get_status_many_threaded(self,
+                                 pv_system_ids_and_dates: Iterable[
+                                     Tuple[int, Union[str, datetime]]],
+                                 max_workers: int = 8,
+                                 fast_parse: bool = True,
+                                 **kwargs
+                                 ) -> List[pd.DataFrame]:
+        """Get PV system status for many (PV system ID, date) pairs, using a
+        pool of threads.  Unlike `get_status_many()`, doesn't need aiohttp.
+
+        The API requests are always sent from the worker threads, so the
+        network round trips overlap.  On a free-threaded build of Python
+        (e.g. 3.13t with the GIL disabled), the CSV parsing also runs in the
+        worker threads, in parallel.  On a standard build, parsing in
+        threads would just contend for the GIL, so the responses are parsed
+        one at a time in the calling thread.
+
+        Args:
+            pv_system_ids_and_dates: iterable of (pv_system_id, date) tuples.
+                See `get_status()` for the format of each element.
+            max_workers: int, number of threads.
+            fast_parse: bool, see `get_status()`.
+            **kwargs: passed to `get_status()`.
+
+        Returns:
+            list of pd.DataFrames, in the same order as
+            `pv_system_ids_and_dates`.
+        """
+        parse_in_threads = not _is_gil_enabled()
+
+        def _get_status(pv_system_id_and_date):
+            pv_system_id, date = pv_system_id_and_date
+            if parse_in_threads:
+                return self.get_status(
+                    pv_system_id, date, fast_parse=fast_parse, **kwargs)
+            return self._get_status_content(pv_system_id, date, **kwargs)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(
+                executor.map(_get_status, pv_system_ids_and_dates))
+
+        if parse_in_threads:
+            return results
+        return [
+            _process_status(content, fast_parse=fast_parse)
+            for content in results]
+
+    def get_status_many(self,
+                        pv_system_ids_and_dates: Iterable[
+                            Tuple[int, Union[str, datetime]]],
+                        max_concurrency: int = 16,
+                        **kwargs
+                        ) -> List[pd.DataFrame]:
+        """Get PV system status for many (PV system ID, date) pairs.
+
+        Requests are sent concurrently (at most `max_concurrency` at a time)
+        so the network round trips overlap.  Requires aiohttp.
+
+        This starts its own event loop with `asyncio.run()`, so it can't be
+        called from code which is already running in an event loop (e.g. a
+        Jupyter notebook).  There, use
+        `await pv.get_status_many_async(...)` instead.
 
-        return pv_system_status
+        Args:
+            pv_system_ids_and_dates: iterable of (pv_system_id, date) tuples.
+                See `get_status()` for the format of each element.
+            max_concurrency: int, max number of requests in flight at once.
+            **kwargs: passed to `get_status_many_async()`.
+
+        Returns:
+            list of pd.DataFrames, in the same order as
+            `pv_system_ids_and_dates`.  See `get_status()` for the format
+            of each DataFrame.
+        """
+        return asyncio.run(self.get_status_many_async(
+            pv_system_ids_and_dates, max_concurrency=max_concurrency,
+            **kwargs))
+
+    async def get_status_many_async(
+            self,
+            pv_system_ids_and_dates: Iterable[
+                Tuple[int, Union[str, datetime]]],
+            max_concurrency: int = 16,
+            wait_if_rate_limit_exceeded: bool = False,
+            max_rate_limit_retries: int = 5,
+            fast_parse: bool = True
+            ) -> List[pd.DataFrame]:
+        """Async version of `get_status_many()`.
+
+        If the rate limit is exceeded and `wait_if_rate_limit_exceeded` is
+        True then all requests are paused until the rate limit is reset,
+        up to `max_rate_limit_retries` times.  If any query fails then the
+        remaining queries are cancelled and the exception is raised.
+
+        Args:
+            fast_parse: bool, see `get_status()`.
+        """
+        async with _get_aiohttp_session(max_concurrency) as session:
+            get_status = self._make_async_status_getter(
+                session, max_concurrency, wait_if_rate_limit_exceeded,
+                max_rate_limit_retries, fast_parse)
+            tasks = [
+                asyncio.ensure_future(get_status(pv_system_id, date))
+                for pv_system_id, date in pv_system_ids_and_dates]
+            try:
+                return await asyncio.gather(*tasks)
+            finally:
+                # If one query failed then stop the others, and wait for
+                # them to finish cancelling before the session is closed.
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def iter_status(self,
+                    pv_system_ids_and_dates: Iterable[
+                        Tuple[int, Union[str, datetime]]],
+                    **kwargs
+                    ) -> Iterator[Tuple[int, Union[str, datetime],
+                                        pd.DataFrame]]:
+        """Get PV system status for many (PV system ID, date) pairs, one at
+        a time.
+
+        Use this instead of collecting the results of many `get_status()`
+        calls into a list, so only one day of data is held in memory at once
+        (e.g. when writing each DataFrame straight to disk).
+
+        Args:
+            pv_system_ids_and_dates: iterable of (pv_system_id, date) tuples.
+                See `get_status()` for the format of each element.
+            **kwargs: passed to `get_status()`.
+
+        Yields:
+            (pv_system_id, date, pd.DataFrame) tuples.  See `get_status()` for
+            the format of the DataFrame.
+        """
+        for pv_system_id, date in pv_system_ids_and_dates:
+            yield pv_system_id, date, self.get_status(
+                pv_system_id, date, **kwargs)
+
+    async def iter_status_async(
+            self,
+            pv_system_ids_and_dates: Iterable[
+                Tuple[int, Union[str, datetime]]],
+            max_concurrency: int = 16,
+            wait_if_rate_limit_exceeded: bool = False,
+            max_rate_limit_retries: int = 5,
+            fast_parse: bool = True
+            ) -> AsyncIterator[Tuple[int, Union[str, datetime],
+                                     pd.DataFrame]]:
+        """Async version of `iter_status()`.  Requests are sent concurrently,
+        as in `get_status_many_async()`, and results are yielded in the
+        order they arrive.  At most `max_concurrency` results are held in
+        memory at once.  Requires aiohttp.
+
+        Args:
+            fast_parse: bool, see `get_status()`.
+
+        Yields:
+            (pv_system_id, date, pd.DataFrame) tuples.
+        """
+        async with _get_aiohttp_session(max_concurrency) as session:
+            get_status = self._make_async_status_getter(
+                session, max_concurrency, wait_if_rate_limit_exceeded,
+                max_rate_limit_retries, fast_parse)
+
+            async def _get_status(pv_system_id, date):
+                return pv_system_id, date, await get_status(
+                    pv_system_id, date)
+
+            # Only keep up to max_concurrency tasks pending at once, and pull
+            # from pv_system_ids_and_dates lazily, so memory use is bounded
+            # no matter how many results are requested.
+            pv_system_ids_and_dates = iter(pv_system_ids_and_dates)
+            pending = set()
+            try:
+                while True:
+                    for pv_system_id, date in itertools.islice(
+                            pv_system_ids_and_dates,
+                            max_concurrency - len(pending)):
+                        pending.add(asyncio.ensure_future(
+                            _get_status(pv_system_id, date)))
+                    if not pending:
+                        break
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            finally:
+                # In case the caller stopped iterating early, or a query
+                # failed.  Wait for the tasks to finish cancelling before
+                # the session is closed.
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def _make_async_status_getter(self,
+                                  session,
+                                  max_concurrency: int,
+                                  wait_if_rate_limit_exceeded: bool,
+                                  max_rate_limit_retries: int,
+                                  fast_parse: bool
+                                  ) -> Callable[
+                                      [int, Union[str, datetime]],
+                                      Awaitable[pd.DataFrame]]:
+        """Returns a coroutine function `get_status(pv_system_id, date)`.
+
+        All the coroutines share `session`, and share the rate-limit state
+        for this batch of queries.
+
+        Args:
+            session: aiohttp.ClientSession
+        """
+        # Set when we're allowed to send requests; cleared whilst waiting
+        # for the rate limit to reset.
+        rate_limit_ok = asyncio.Event()
+        rate_limit_ok.set()
+        # The number of queries in flight is limited by both
+        # max_concurrency and the rate controller's current_concurrency,
+        # which shrinks as the remaining rate-limit quota shrinks.
+        concurrency_changed = asyncio.Condition()
+        num_in_flight = 0
+
+        def _can_send_query():
+            concurrency = min(
+                max_concurrency,
+                int(self._rate_controller.current_concurrency))
+            return num_in_flight < max(concurrency, 1)
+
+        async def _get_status(pv_system_id, date):
+            nonlocal num_in_flight
+            api_params = _get_status_api_params(pv_system_id, date)
+            async with concurrency_changed:
+                await concurrency_changed.wait_for(_can_send_query)
+                num_in_flight += 1
+            try:
+                content = await self._api_query_async(
+                    session,
+                    rate_limit_ok,
+                    service='getstatus',
+                    api_params=api_params,
+                    wait_if_rate_limit_exceeded=wait_if_rate_limit_exceeded,
+                    max_rate_limit_retries=max_rate_limit_retries)
+            except NoStatusFound:
+                _LOG.info(
+                    'system_id %d: No status found for date %s',
+                    pv_system_id, api_params['d'])
+                content = b""
+            finally:
+                async with concurrency_changed:
+                    num_in_flight -= 1
+                    concurrency_changed.notify_all()
+            return _process_status(content, fast_parse=fast_parse)
+
+        return _get_status
 
     def get_batch_status(self,
                          pv_system_id: int,
@@ -354,34 +602,7 @@ class PVOutput:
             },
             **kwargs)
 
-        pv_metadata = pd.read_csv(
-            StringIO(pv_metadata_text),
-            lineterminator=';',
-            names=[
-                'name',
-                'system_AC_capacity_W',
-                'address',
-                'num_panels',
-                'panel_capacity_W_each',
-                'panel_brand',
-                'num_inverters',
-                'inverter_capacity_W',
-                'inverter_brand',
-                'orientation',
-                'array_tilt_degrees',
-                'shade',
-                'install_date',
-                'latitude',
-                'longitude',
-                'status_interval_minutes',
-                'secondary_num_panels',
-                'secondary_panel_capacity_W_each',
-                'secondary_orientation',
-                'secondary_array_tilt_degrees'
-            ],
-            parse_dates=['install_date'],
-            nrows=1
-        ).squeeze()
+        pv_metadata = _process_metadata(pv_metadata_text)
         pv_metadata['system_id'] = pv_system_id
         pv_metadata.name = pv_system_id
         return pv_metadata
@@ -436,37 +657,7 @@ class PVOutput:
         except NoStatusFound:
             pv_metadata_text = ""
 
-        columns = [
-                'total_energy_gen_Wh',
-                'energy_exported_Wh',
-                'average_daily_energy_gen_Wh',
-                'minimum_daily_energy_gen_Wh',
-                'maximum_daily_energy_gen_Wh',
-                'average_efficiency_kWh_per_kW',
-                'num_outputs',
-                'actual_date_from',
-                'actual_date_to',
-                'record_efficiency_kWh_per_kW',
-                'record_efficiency_date'
-            ]
-        date_cols = [
-                'actual_date_from',
-                'actual_date_to',
-                'record_efficiency_date'
-            ]
-        numeric_cols = set(columns) - set(date_cols)
-        pv_metadata = pd.read_csv(
-            StringIO(pv_metadata_text),
-            names=columns,
-            dtype={col: np.float32 for col in numeric_cols},
-            parse_dates=date_cols
-        )
-        if pv_metadata.empty:
-            data = {col: np.float32(np.NaN) for col in numeric_cols}
-            data.update({col: pd.NaT for col in date_cols})
-            pv_metadata = pd.DataFrame(data, index=[pv_system_id])
-        else:
-            pv_metadata.index = [pv_system_id]
+        pv_metadata = _process_statistic(pv_metadata_text, pv_system_id)
 
         pv_metadata['query_date_from'] = (
             pd.Timestamp(date_from) if date_from else pd.NaT)
@@ -709,8 +900,10 @@ class PVOutput:
                       pv_system_id, date_to_load)
             datetime_of_api_request = pd.Timestamp.utcnow()
             if use_get_status:
+                # Existing HDF5 files store the timeseries as float64, and
+                # HDFStore.append can't mix dtypes within a table.
                 timeseries = self.get_status(
-                    pv_system_id, date_to_load,
+                    pv_system_id, date_to_load, dtype=np.float64,
                     wait_if_rate_limit_exceeded=True)
             else:
                 timeseries = self.get_batch_status(
@@ -761,15 +954,23 @@ class PVOutput:
                    service: str,
                    api_params: Dict,
                    wait_if_rate_limit_exceeded: bool = False,
-                   use_data_service: bool = False
-                   ) -> str:
+                   use_data_service: bool = False,
+                   max_rate_limit_retries: int = 5,
+                   decode: bool = True
+                   ) -> Union[str, bytes]:
         """Send API request to PVOutput.org and return content text.
 
         Args:
             service: string, e.g. 'search' or 'getstatus'
             api_params: dict
-            wait_if_rate_limit_exceeded: bool
+            wait_if_rate_limit_exceeded: bool.  If True then requests are
+                spaced out when the rate-limit quota is nearly used up, and
+                if the quota is exceeded then wait for it to reset and retry.
             use_data_service: bool
+            max_rate_limit_retries: int, max number of times to wait for the
+                rate limit to reset and retry.  Only used if
+                wait_if_rate_limit_exceeded is True.
+            decode: bool, if False then return the undecoded bytes.
 
         Raises:
             NoStatusFound
@@ -778,27 +979,86 @@ class PVOutput:
         get_response_func = (
             self._get_data_service_response if use_data_service else
             self._get_api_response)
+        process_response_func = (
+            self._process_api_response if decode else
+            self._process_api_response_bytes)
 
-        try:
-            response = get_response_func(service, api_params)
-        except Exception as e:
-            _LOG.exception(e)
-            raise
-
-        try:
-            return self._process_api_response(response)
-        except RateLimitExceeded:
-            msg = (
-                "PVOutput.org API rate limit exceeded!"
-                "  Rate limit will be reset at {}".format(
-                    self.rate_limit_reset_time))
-            _print_and_log(msg)
+        for retry in range(max_rate_limit_retries + 1):
             if wait_if_rate_limit_exceeded:
+                # Only pace requests if the caller is happy to wait.
+                # Otherwise, PVOutput.org will tell us if we've exceeded
+                # the rate limit, and we'll raise RateLimitExceeded.
+                self._rate_controller.acquire()
+            try:
+                response = get_response_func(service, api_params)
+            except Exception as e:
+                _LOG.exception(e)
+                raise
+
+            try:
+                return process_response_func(response)
+            except RateLimitExceeded:
+                msg = (
+                    "PVOutput.org API rate limit exceeded!"
+                    "  Rate limit will be reset at {}".format(
+                        self.rate_limit_reset_time))
+                _print_and_log(msg)
+                if (not wait_if_rate_limit_exceeded or
+                        retry == max_rate_limit_retries):
+                    raise RateLimitExceeded(response, msg)
                 self.wait_for_rate_limit_reset()
-                return self._api_query(
-                    service, api_params, wait_if_rate_limit_exceeded=False)
 
-            raise RateLimitExceeded(response, msg)
+    async def _api_query_async(self,
+                               session,
+                               rate_limit_ok: asyncio.Event,
+                               service: str,
+                               api_params: Dict,
+                               wait_if_rate_limit_exceeded: bool = False,
+                               max_rate_limit_retries: int = 5
+                               ) -> bytes:
+        """Async version of `_api_query(..., decode=False)`.
+
+        Args:
+            session: aiohttp.ClientSession
+            rate_limit_ok: asyncio.Event shared by all concurrent queries.
+                Cleared whilst waiting for the rate limit to reset.
+            service: string, e.g. 'search' or 'getstatus'
+            api_params: dict
+            wait_if_rate_limit_exceeded: bool
+            max_rate_limit_retries: int
+
+        Raises:
+            NoStatusFound
+            RateLimitExceeded
+        """
+        api_url, headers = self._get_api_url_and_headers(service)
+        for retry in range(max_rate_limit_retries + 1):
+            await rate_limit_ok.wait()
+            if wait_if_rate_limit_exceeded:
+                await self._rate_controller.acquire_async()
+            try:
+                response = await _get_response_async(
+                    session, api_url, api_params, headers)
+            except Exception as e:
+                _LOG.exception(e)
+                raise
+
+            try:
+                return self._process_api_response_bytes(response)
+            except RateLimitExceeded:
+                msg = (
+                    "PVOutput.org API rate limit exceeded!"
+                    "  Rate limit will be reset at {}".format(
+                        self.rate_limit_reset_time))
+                _print_and_log(msg)
+                if (not wait_if_rate_limit_exceeded or
+                        retry == max_rate_limit_retries):
+                    raise RateLimitExceeded(response, msg)
+                if rate_limit_ok.is_set():
+                    # We're the first to notice, so pause every query.
+                    rate_limit_ok.clear()
+                    await asyncio.sleep(self._secs_to_wait_for_rate_limit())
+                    rate_limit_ok.set()
 
     def _get_api_response(self,
                           service: str,
@@ -809,17 +1069,19 @@ class PVOutput:
             service: string, e.g. 'search', 'getstatus'
             api_params: dict
         """
-        self._check_api_params()
-        # Create request headers
-        headers = {
-            'X-Rate-Limit': '1',
-            'X-Pvoutput-Apikey': self.api_key,
-            'X-Pvoutput-SystemId': self.system_id}
+        api_url, headers = self._get_api_url_and_headers(service)
+        return _get_response(api_url, api_params, headers)
 
-        api_url = os.path.join(
-            BASE_URL, 'service/r2/{}.jsp'.format(service))
+    def _get_api_url_and_headers(self, service: str) -> Tuple[str, Dict]:
+        """
+        Args:
+            service: string, e.g. 'search', 'getstatus'
+        """
+        self._check_api_params()
+        headers = _get_api_headers(self.api_key, self.system_id)
+        api_url = _get_api_url(BASE_URL, service)
 
-        return _get_response(api_url, api_params, headers)
+        return api_url, headers
 
     def _get_data_service_response(self,
                                    service: str,
@@ -835,13 +1097,12 @@ class PVOutput:
             raise ValueError(
                 'data_service_url must be set to use the data service!')
 
-        headers = {'X-Rate-Limit': '1'}
+        headers = _DATA_SERVICE_HEADERS
         api_params = api_params.copy()
         api_params['key'] = self.api_key
         api_params['sid'] = self.system_id
 
-        api_url = os.path.join(
-            self.data_service_url, 'service/r2/{}.jsp'.format(service))
+        api_url = _get_api_url(self.data_service_url, service)
 
         return _get_response(api_url, api_params, headers)
 
@@ -853,16 +1114,29 @@ class PVOutput:
                     'Please set the {} parameter.'.format(param_name))
 
     def _set_rate_limit_params(self, headers):
-        for param_name, header_key in RATE_LIMIT_PARAMS_TO_API_HEADERS.items():
-            header_value = int(headers[header_key])
-            setattr(self, param_name, header_value)
-
-        self.rate_limit_reset_time = pd.Timestamp.utcfromtimestamp(
-            self.rate_limit_reset_time)
-        self.rate_limit_reset_time = self.rate_limit_reset_time.tz_localize(
-            'utc')
-
-        _LOG.debug('%s', self.rate_limit_info())
+        rate_limit_params = {
+            param_name: int(headers[header_key])
+            for param_name, header_key
+            in RATE_LIMIT_PARAMS_TO_API_HEADERS.items()}
+        self.rate_limit_remaining = rate_limit_params['rate_limit_remaining']
+        self.rate_limit_total = rate_limit_params['rate_limit_total']
+        self._rate_limit_reset_timestamp = rate_limit_params[
+            'rate_limit_reset_time']
+
+        self._rate_controller.update(
+            remaining=self.rate_limit_remaining,
+            limit=self.rate_limit_total,
+            reset_timestamp=self._rate_limit_reset_timestamp)
+
+        if _LOG.isEnabledFor(logging.DEBUG):
+            _LOG.debug('%s', self.rate_limit_info())
+
+    @property
+    def rate_limit_reset_time(self) -> Optional[pd.Timestamp]:
+        if self._rate_limit_reset_timestamp is None:
+            return None
+        return pd.Timestamp(self._rate_limit_reset_timestamp, unit='s',
+                            tz='utc')
 
     def rate_limit_info(self) -> Dict:
         info = {}
@@ -884,6 +1158,31 @@ class PVOutput:
             NoStatusFound
             RateLimitExceeded
         """
+        content = self._process_api_response_bytes(response)
+        try:
+            return content.decode('latin1')
+        except Exception as e:
+            msg = "Error decoding this string: {}\n{}".format(content, e)
+            _LOG.exception(msg)
+            raise
+
+    def _process_api_response_bytes(self,
+                                    response: requests.Response) -> bytes:
+        """Like `_process_api_response()` but doesn't decode the content.
+        Use this when the content is going straight into pd.read_csv, which
+        can decode whilst it parses.
+
+        Args:
+            response: from _get_api_response()
+
+        Returns:
+            content of the response, with leading and trailing whitespace
+            removed.
+
+        Raises:
+            NoStatusFound
+            RateLimitExceeded
+        """
         if response.status_code == 400:
             raise NoStatusFound(response=response)
 
@@ -903,38 +1202,174 @@ class PVOutput:
         if response.status_code == 403 and self.rate_limit_remaining <= 0:
             raise RateLimitExceeded(response=response)
 
-        try:
-            content = response.content.decode('latin1').strip()
-        except Exception as e:
-            msg = "Error decoding this string: {}\n{}".format(
-                response.content, e)
-            _LOG.exception(msg)
-            raise
-
         # If we get to here then the content is valid :)
-        return content
+        return response.content.strip()
 
     def wait_for_rate_limit_reset(self):
-        utc_now = pd.Timestamp.utcnow()
-        timedelta_to_wait = self.rate_limit_reset_time - utc_now
-        timedelta_to_wait += timedelta(minutes=3)  # Just for safety
-        secs_to_wait = timedelta_to_wait.total_seconds()
-        retry_time_utc = utc_now + timedelta_to_wait
+        time.sleep(self._secs_to_wait_for_rate_limit())
+
+    def _secs_to_wait_for_rate_limit(self) -> float:
+        now = time.time()
+        secs_to_wait = max(self._rate_limit_reset_timestamp - now, 0)
+        secs_to_wait += 3 * 60  # Just for safety
+        retry_time_utc = pd.Timestamp(now + secs_to_wait, unit='s', tz='utc')
         _print_and_log('Waiting {:.0f} seconds.  Will retry at {}'.format(
             secs_to_wait, retry_time_utc))
-        time.sleep(secs_to_wait)
+        return secs_to_wait
+
+
+@functools.lru_cache(maxsize=8)
+def _get_api_headers(api_key: str, system_id: str) -> Dict:
+    """Request headers for the PVOutput.org API.  Cached, so we don't build
+    a new dict for every request.  Don't modify the returned dict!"""
+    return {
+        'X-Rate-Limit': '1',
+        'X-Pvoutput-Apikey': api_key,
+        'X-Pvoutput-SystemId': system_id}
+
+
+_DATA_SERVICE_HEADERS = {'X-Rate-Limit': '1'}
+
+
+class _RateController:
+    """Paces API requests using PVOutput.org's rate-limit headers.
+
+    Uses additive-increase / multiplicative-decrease (AIMD): whilst plenty
+    of the rate-limit quota remains, the allowed concurrency creeps up.  When
+    less than `low_quota_fraction` of the quota remains, the concurrency is
+    halved and the remaining requests are spread evenly over the time left
+    until the rate limit resets, rather than using up the quota and then
+    waiting (possibly for hours) after a '403 Forbidden'.
+
+    Attributes:
+        current_concurrency: float, max number of requests in flight.
+        min_interval_seconds: float, min number of seconds between requests.
+    """
+    def __init__(self,
+                 max_concurrency: int = 32,
+                 low_quota_fraction: float = 0.1,
+                 additive_increase: float = 0.5,
+                 multiplicative_decrease: float = 0.5):
+        self.max_concurrency = max_concurrency
+        self.low_quota_fraction = low_quota_fraction
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.current_concurrency = float(max_concurrency)
+        self.min_interval_seconds = 0.0
+        self._last_request_time = None  # In time.monotonic() seconds.
+        self._lock = threading.Lock()
+
+    def update(self,
+               remaining: int,
+               limit: int,
+               reset_timestamp: int,
+               now: Optional[float] = None):
+        """Update after each response.
+
+        Args:
+            remaining: value of the X-Rate-Limit-Remaining header.
+            limit: value of the X-Rate-Limit-Limit header.
+            reset_timestamp: value of the X-Rate-Limit-Reset header
+                (seconds since the epoch).
+            now: seconds since the epoch.  Defaults to time.time().
+        """
+        if now is None:
+            now = time.time()
+        if limit > 0 and remaining / limit < self.low_quota_fraction:
+            self.current_concurrency = max(
+                self.current_concurrency * self.multiplicative_decrease, 1.0)
+            secs_to_reset = max(reset_timestamp - now, 0)
+            self.min_interval_seconds = secs_to_reset / max(remaining, 1)
+        else:
+            self.current_concurrency = min(
+                self.current_concurrency + self.additive_increase,
+                self.max_concurrency)
+            self.min_interval_seconds = 0.0
+
+    def acquire(self):
+        """Block until the next request is allowed to be sent."""
+        while True:
+            secs_to_wait = self._secs_until_next_request()
+            if secs_to_wait <= 0:
+                return
+            _log_pacing_wait(secs_to_wait)
+            time.sleep(secs_to_wait)
+
+    async def acquire_async(self):
+        """Async version of `acquire()`."""
+        while True:
+            secs_to_wait = self._secs_until_next_request()
+            if secs_to_wait <= 0:
+                return
+            _log_pacing_wait(secs_to_wait)
+            await asyncio.sleep(secs_to_wait)
+
+    def _secs_until_next_request(self) -> float:
+        """Returns 0 (and records the time of the request) if a request may
+        be sent now.  Otherwise returns the number of seconds to wait before
+        checking again.
+
+        The wait is computed from the current `min_interval_seconds` each
+        time, so the interval is relaxed as soon as `update()` sees a fresh
+        quota.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._last_request_time is not None:
+                secs_to_wait = (
+                    self._last_request_time + self.min_interval_seconds - now)
+                if secs_to_wait > 0:
+                    return secs_to_wait
+            self._last_request_time = now
+        return 0.0
+
+
+def _log_pacing_wait(secs_to_wait: float):
+    retry_time_utc = pd.Timestamp(
+        time.time() + secs_to_wait, unit='s', tz='utc')
+    _print_and_log(
+        'Rate limit quota is nearly used up.  Waiting {:.0f} seconds'
+        ' before the next request, at {}'.format(
+            secs_to_wait, retry_time_utc))
 
 
 def date_to_pvoutput_str(date: Union[str, datetime]) -> str:
     """Convert datetime to date string for PVOutput.org in YYYYMMDD format."""
     if isinstance(date, str):
         try:
-            datetime.strptime(date, PV_OUTPUT_DATE_FORMAT)
+            _parse_pvoutput_date(date)
         except ValueError:
-            return pd.Timestamp(date).strftime(PV_OUTPUT_DATE_FORMAT)
+            date = pd.Timestamp(date)
         else:
             return date
-    return date.strftime(PV_OUTPUT_DATE_FORMAT)
+    # Equivalent to date.strftime(PV_OUTPUT_DATE_FORMAT), but much faster.
+    return f'{date.year:04d}{date.month:02d}{date.day:02d}'
+
+
+def _is_gil_enabled() -> bool:
+    """False if running on a free-threaded build of Python with the GIL
+    disabled.  This can change at runtime (e.g. importing an extension
+    module which doesn't support free-threading re-enables the GIL), so
+    check each time rather than caching."""
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def _get_status_api_params(pv_system_id: int,
+                           date: Union[str, datetime]) -> Dict:
+    _LOG.info(
+        "system_id %d: Requesting system status for %s",
+        pv_system_id, date)
+    date = date_to_pvoutput_str(date)
+    _check_date(date)
+
+    return {
+        'd': date,  # date, YYYYMMDD, localtime of the PV system
+        'h': 1,  # We want historical data.
+        'limit': 288,  # API limit is 288 (num of 5-min periods per day).
+        'ext': 0,  # Extended data; we don't want extended data.
+        'sid1': pv_system_id  # SystemID.
+    }
 
 
 def _check_date(date: str):
@@ -944,13 +1379,39 @@ def _check_date(date: str):
     Raises:
         ValueError if the date is 'bad'.
     """
-    dt = datetime.strptime(date, PV_OUTPUT_DATE_FORMAT)
-    if dt > datetime.now():
+    if _parse_pvoutput_date(date) > _today():
         raise ValueError(
             'date should not be in the future.  Got {}.  Current date is {}.'
             .format(date, datetime.now()))
 
 
+@functools.lru_cache(maxsize=8192)
+def _parse_pvoutput_date(date_str: str) -> date:
+    """Parse a YYYYMMDD date string.  Bulk downloads check the same date
+    strings over and over, so cache the results.
+
+    Raises:
+        ValueError if the date string doesn't match YYYYMMDD.
+    """
+    return datetime.strptime(date_str, PV_OUTPUT_DATE_FORMAT).date()
+
+
+# (time.monotonic() when _TODAY was last updated, today's date)
+_TODAY = (None, None)
+_TODAY_MAX_AGE_SECS = 60
+
+
+def _today() -> date:
+    """Today's date, refreshed at most every _TODAY_MAX_AGE_SECS seconds."""
+    global _TODAY
+    last_updated, today = _TODAY
+    now = time.monotonic()
+    if last_updated is None or now - last_updated > _TODAY_MAX_AGE_SECS:
+        today = datetime.now().date()
+        _TODAY = (now, today)
+    return today
+
+
 def _set_date_param(dt, api_params, key):
     if dt is not None:
         dt = date_to_pvoutput_str(dt)
@@ -981,6 +1442,255 @@ def check_pv_system_status(pv_system_status: pd.DataFrame,
                     .format(d, requested_date))
 
 
+# See https://pvoutput.org/help.html#api-getstatus but make sure
+# you read the 'History Query' subsection, as a historical query
+# has slightly different return columns compared to a non-historical
+# query!
+_STATUS_COLUMNS = [
+    'cumulative_energy_gen_Wh',
+    'energy_efficiency_kWh_per_kW',
+    'instantaneous_power_gen_W',
+    'average_power_gen_W',
+    'power_gen_normalised',
+    'energy_consumption_Wh',
+    'power_demand_W',
+    'temperature_C',
+    'voltage']
+
+
+def _process_status(pv_system_status_content: bytes,
+                    fast_parse: bool = True,
+                    dtype=np.float32) -> pd.DataFrame:
+    if fast_parse and pv_system_status_content:
+        try:
+            pv_system_status = _parse_status_payload(
+                pv_system_status_content, dtype=dtype)
+        except (ValueError, IndexError) as e:
+            _LOG.debug('Falling back to pd.read_csv: %s', e)
+        else:
+            return _sort_index(pv_system_status)
+
+    column_dtypes = {col: dtype for col in _STATUS_COLUMNS}
+    column_dtypes.update({'date': str, 'time': str})
+    pv_system_status = pd.read_csv(
+        BytesIO(pv_system_status_content),
+        encoding='latin1',
+        lineterminator=';',
+        names=['date', 'time'] + _STATUS_COLUMNS,
+        dtype=column_dtypes,
+        engine='c',
+        low_memory=False)
+
+    return _sort_index(_set_datetime_index(pv_system_status))
+
+
+def _parse_status_payload(pv_system_status_content: bytes,
+                          dtype=np.float32) -> pd.DataFrame:
+    """Parser specialised for the getstatus response, which is much faster
+    than the general-purpose pd.read_csv.
+
+    Returns the same DataFrame as the pd.read_csv path in _process_status(),
+    except that the index isn't sorted.
+
+    Raises:
+        ValueError if the content doesn't match the expected schema (e.g.
+            rows with the wrong number of fields, or empty fields).
+    """
+    num_fields = len(_STATUS_COLUMNS) + 2
+    rows = pv_system_status_content.split(b';')
+    values = []
+    minutes_since_epoch = np.empty(len(rows), dtype=np.int64)
+    # Map from date string to minutes since the epoch.  A response only
+    # contains a day or two of data, so cache the parsed dates.
+    dates = {}
+    for i, row in enumerate(rows):
+        fields = row.split(b',')
+        if len(fields) != num_fields:
+            raise ValueError(
+                'Expected {} fields per row.  Got {}.'.format(
+                    num_fields, row))
+        date_str, time_str = fields[0], fields[1]
+        if date_str not in dates:
+            dates[date_str] = (
+                np.datetime64(_parse_pvoutput_date(date_str.decode()), 'm')
+                .astype(np.int64))
+        if len(time_str) != 5 or time_str[2:3] != b':':
+            raise ValueError('Bad time: {}'.format(time_str))
+        minutes_since_epoch[i] = (
+            dates[date_str] + int(time_str[:2]) * 60 + int(time_str[3:]))
+        values.extend(fields[2:])
+
+    # Raises ValueError for empty fields.
+    values = np.array(values, dtype=dtype).reshape(
+        len(rows), len(_STATUS_COLUMNS))
+    index = pd.DatetimeIndex(
+        minutes_since_epoch.astype('datetime64[m]').astype('datetime64[ns]'),
+        name='datetime')
+    return pd.DataFrame(values, index=index, columns=_STATUS_COLUMNS)
+
+
+def _process_metadata(pv_metadata_text: str) -> pd.Series:
+    # See https://pvoutput.org/help.html#api-getsystem
+    columns = [
+        'name',
+        'system_AC_capacity_W',
+        'address',
+        'num_panels',
+        'panel_capacity_W_each',
+        'panel_brand',
+        'num_inverters',
+        'inverter_capacity_W',
+        'inverter_brand',
+        'orientation',
+        'array_tilt_degrees',
+        'shade',
+        'install_date',
+        'latitude',
+        'longitude',
+        'status_interval_minutes',
+        'secondary_num_panels',
+        'secondary_panel_capacity_W_each',
+        'secondary_orientation',
+        'secondary_array_tilt_degrees'
+    ]
+
+    # The response is a single row, so splitting it by hand is much cheaper
+    # than setting up pd.read_csv.
+    fields = pv_metadata_text.split(';', 1)[0].split(',')
+    pv_metadata = None
+    if len(fields) == len(columns):
+        try:
+            pv_metadata = pd.Series(
+                [field if col == 'install_date' else _parse_csv_field(field)
+                 for col, field in zip(columns, fields)],
+                index=columns,
+                dtype=object)
+        except ValueError:
+            pass
+    if pv_metadata is None:
+        # e.g. if a quoted field contains a comma.
+        pv_metadata = pd.read_csv(
+            StringIO(pv_metadata_text),
+            lineterminator=';',
+            names=columns,
+            dtype={'install_date': str},
+            engine='c',
+            nrows=1
+        ).squeeze()
+    pv_metadata['install_date'] = pd.to_datetime(
+        pv_metadata['install_date'], format=PV_OUTPUT_DATE_FORMAT,
+        errors='coerce')
+    return pv_metadata
+
+
+def _process_statistic(pv_statistic_text: str,
+                       pv_system_id: int) -> pd.DataFrame:
+    # See https://pvoutput.org/help.html#api-getstatistic
+    columns = [
+        'total_energy_gen_Wh',
+        'energy_exported_Wh',
+        'average_daily_energy_gen_Wh',
+        'minimum_daily_energy_gen_Wh',
+        'maximum_daily_energy_gen_Wh',
+        'average_efficiency_kWh_per_kW',
+        'num_outputs',
+        'actual_date_from',
+        'actual_date_to',
+        'record_efficiency_kWh_per_kW',
+        'record_efficiency_date'
+    ]
+    date_cols = [
+        'actual_date_from',
+        'actual_date_to',
+        'record_efficiency_date'
+    ]
+
+    if pv_statistic_text:
+        fields = pv_statistic_text.split(';', 1)[0].split(',')
+    else:
+        fields = [''] * len(columns)
+
+    if len(fields) == len(columns):
+        try:
+            data = {}
+            for col, field in zip(columns, fields):
+                if col in date_cols:
+                    data[col] = pd.to_datetime(
+                        field, format=PV_OUTPUT_DATE_FORMAT, errors='coerce')
+                elif not field:
+                    data[col] = np.float32(np.NaN)
+                elif _CSV_FLOAT.fullmatch(field):
+                    data[col] = np.float32(field)
+                else:
+                    # Let pd.read_csv decide what to do with it.
+                    raise ValueError(field)
+        except ValueError:
+            pass
+        else:
+            return pd.DataFrame(data, index=[pv_system_id])
+
+    numeric_cols = set(columns) - set(date_cols)
+    dtype = {col: np.float32 for col in numeric_cols}
+    dtype.update({col: str for col in date_cols})
+    pv_statistic = pd.read_csv(
+        StringIO(pv_statistic_text),
+        names=columns,
+        dtype=dtype,
+        engine='c'
+    )
+    for col in date_cols:
+        pv_statistic[col] = pd.to_datetime(
+            pv_statistic[col], format=PV_OUTPUT_DATE_FORMAT,
+            errors='coerce')
+    pv_statistic.index = [pv_system_id]
+    return pv_statistic
+
+
+# Plain numeric literals, which int() or float() parse exactly like
+# pd.read_csv.  Other spellings (e.g. '1_000' or ' 7') are left to
+# pd.read_csv.
+_CSV_INT = re.compile(r'[-+]?\d+')
+_CSV_FLOAT = re.compile(r'[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?')
+
+# Strings which pd.read_csv reads as NaN by default.
+_CSV_NA_VALUES = frozenset([
+    '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null'])
+
+# Strings which pd.read_csv reads as booleans by default.
+_CSV_BOOL_VALUES = frozenset([
+    'True', 'TRUE', 'true', 'False', 'FALSE', 'false'])
+
+
+def _parse_csv_field(field: str) -> Union[np.int64, np.float64, str]:
+    """Convert a single CSV field to the same value, of the same type, as
+    pd.read_csv would for a one-row CSV.
+
+    Raises:
+        ValueError: if pd.read_csv might not parse the field the same way
+            as this function would (e.g. 'NA', '1_000', 'True' or a quoted
+            field), so the caller should fall back to pd.read_csv.
+    """
+    if field == '':
+        return np.float64(np.NaN)
+    if _CSV_INT.fullmatch(field):
+        try:
+            return np.int64(field)
+        except OverflowError:
+            raise ValueError(field)
+    if _CSV_FLOAT.fullmatch(field):
+        return np.float64(field)
+    if (field in _CSV_NA_VALUES or field in _CSV_BOOL_VALUES or
+            '"' in field):
+        raise ValueError(field)
+    try:
+        float(field)
+    except ValueError:
+        return field
+    raise ValueError(field)
+
+
 def _process_batch_status(pv_system_status_text):
     # See https://pvoutput.org/help.html#dataservice-getbatchstatus
 
@@ -1012,14 +1722,41 @@ def _process_batch_status(pv_system_status_text):
         'temperature_C',
         'voltage']
 
+    dtype = {col: np.float64 for col in columns}
+    dtype.update({'date': str, 'time': str})
     pv_system_status = pd.read_csv(
         StringIO(processed_text),
         names=['date', 'time'] + columns,
-        parse_dates={'datetime': ['date', 'time']},
-        index_col=['datetime'],
-        dtype={col: np.float64 for col in columns}
-    ).sort_index()
+        dtype=dtype,
+        engine='c',
+        low_memory=False)
+
+    return _sort_index(_set_datetime_index(pv_system_status))
+
 
+def _sort_index(df: pd.DataFrame) -> pd.DataFrame:
+    """Sort by index, avoiding a full sort in the common cases.
+
+    PVOutput.org returns getstatus data in reverse chronological order,
+    so reversing the rows is usually enough."""
+    if df.index.is_monotonic_increasing:
+        return df
+    if df.index.is_monotonic_decreasing:
+        return df.iloc[::-1]
+    return df.sort_index()
+
+
+def _set_datetime_index(pv_system_status: pd.DataFrame) -> pd.DataFrame:
+    """Replaces the 'date' and 'time' string columns with a DatetimeIndex.
+
+    Parsing with an explicit format is much faster than letting read_csv
+    combine and infer the format of the date and time columns.
+    """
+    datetimes = pd.to_datetime(
+        pv_system_status.pop('date') + ' ' + pv_system_status.pop('time'),
+        format=PV_OUTPUT_DATETIME_FORMAT,
+        cache=True)
+    pv_system_status.index = pd.DatetimeIndex(datetimes, name='datetime')
     return pv_system_status
 
 
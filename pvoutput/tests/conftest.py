@@ -0,0 +1,59 @@
+import asyncio
+import pytest
+
+
+# Tests replace asyncio.sleep to check the backoff, so keep the real one for
+# the stubs to yield to the event loop.
+_asyncio_sleep = asyncio.sleep
+
+
+class StubAiohttpResponse:
+    def __init__(self, status, content=b'', headers=None):
+        self.status = status
+        self.reason = 'reason'
+        self.headers = headers or {}
+        self.url = 'https://pvoutput.org/service/r2/getstatus.jsp'
+        self._content = content
+
+    async def __aenter__(self):
+        await _asyncio_sleep(0)
+        if isinstance(self._content, Exception):
+            raise self._content
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def read(self):
+        return self._content
+
+
+class StubAiohttpSession:
+    """Looks enough like an aiohttp.ClientSession for _get_response_async.
+
+    Args:
+        responses: list of StubAiohttpResponses, returned in order.
+    """
+    def __init__(self, responses):
+        self.responses = responses
+        self.num_requests = 0
+
+    def get(self, api_url, params, headers):
+        self.num_requests += 1
+        return self.responses.pop(0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_aiohttp_response():
+    return StubAiohttpResponse
+
+
+@pytest.fixture
+def stub_aiohttp_session():
+    return StubAiohttpSession
@@ -1,7 +1,12 @@
 from io import StringIO
+import asyncio
+import contextlib
+import threading
+import time
 import pytest
 import numpy as np
 import pandas as pd
+import requests
 from pvoutput import pvoutput
 from datetime import date
 
@@ -11,6 +16,8 @@ def test_date_to_pvoutput_str():
     assert pvoutput.date_to_pvoutput_str(VALID_DATE_STR) == VALID_DATE_STR
     ts = pd.Timestamp(VALID_DATE_STR)
     assert pvoutput.date_to_pvoutput_str(ts) == VALID_DATE_STR
+    assert pvoutput.date_to_pvoutput_str(date(2019, 1, 1)) == VALID_DATE_STR
+    assert pvoutput.date_to_pvoutput_str("2019-01-01") == VALID_DATE_STR
 
 
 def test_check_date():
@@ -19,6 +26,8 @@ def test_check_date():
         pvoutput._check_date("2010")
     with pytest.raises(ValueError):
         pvoutput._check_date("2010-01-02")
+    with pytest.raises(ValueError):
+        pvoutput._check_date("29990101")
 
 
 def test_check_pv_system_status():
@@ -84,3 +93,404 @@ datetime,cumulative_energy_gen_Wh,instantaneous_power_gen_W,temperature_C,voltag
 
     with pytest.raises(NotImplementedError):
         pvoutput._process_batch_status('20140330;07:35,2,24,2,24,23.1,230.3')
+
+
+def test_process_status():
+    # PVOutput returns the most recent status first.
+    response_content = (
+        b"20190101,00:10,12,0.001,60,70,0.010,NaN,NaN,5.1,240.2;"
+        b"20190101,00:05,6,0.000,NaN,60,0.008,NaN,NaN,5.2,240.1")
+    df = pvoutput._process_status(response_content)
+    assert df.index.name == 'datetime'
+    np.testing.assert_array_equal(
+        df.index, pd.DatetimeIndex(['2019-01-01 00:05', '2019-01-01 00:10']))
+    np.testing.assert_array_equal(
+        df['cumulative_energy_gen_Wh'].values, [6, 12])
+    assert np.isnan(df['instantaneous_power_gen_W'].iloc[0])
+    assert len(df.columns) == 9
+    assert (df.dtypes == np.float32).all()
+
+    empty_df = pvoutput._process_status(b'')
+    assert empty_df.empty
+
+    # The specialised parser should give exactly the same answer as
+    # pd.read_csv.
+    pd.testing.assert_frame_equal(
+        df, pvoutput._process_status(response_content, fast_parse=False))
+
+    # Rows which don't match the schema should fall back to pd.read_csv.
+    with pytest.raises(ValueError):
+        pvoutput._parse_status_payload(b"20190101,00:05,6,,NaN")
+    ragged_df = pvoutput._process_status(
+        b"20190101,00:10,12,0.001,60,70,0.010,,,5.1,240.2;"
+        b"20190101,00:05,6,0.000,NaN,60")
+    assert len(ragged_df) == 2
+    assert np.isnan(ragged_df['voltage'].iloc[0])
+
+    # float64 should hold exactly the values PVOutput sent.
+    for fast_parse in [True, False]:
+        df64 = pvoutput._process_status(
+            response_content, fast_parse=fast_parse, dtype=np.float64)
+        assert (df64.dtypes == np.float64).all()
+        assert df64['energy_efficiency_kWh_per_kW'].iloc[1] == 0.001
+        assert df64['temperature_C'].iloc[0] == 5.2
+
+
+def test_sort_index():
+    index = pd.date_range('2019-01-01', periods=5, freq='5T')
+    df = pd.DataFrame({'a': range(5)}, index=index)
+    for unsorted in [df, df.iloc[::-1], df.iloc[[3, 0, 4, 1, 2]]]:
+        pd.testing.assert_frame_equal(
+            pvoutput._sort_index(unsorted), df, check_freq=False)
+
+
+def test_rate_controller():
+    controller = pvoutput._RateController(max_concurrency=4)
+    NOW = 1000
+    controller.update(remaining=50, limit=60, reset_timestamp=NOW, now=NOW)
+    assert controller.current_concurrency == 4
+    assert controller.min_interval_seconds == 0
+
+    # Less than 10% of quota remaining: halve concurrency and spread the
+    # remaining requests over the time left until the reset.
+    controller.update(remaining=5, limit=60, reset_timestamp=NOW + 600,
+                      now=NOW)
+    assert controller.current_concurrency == 2
+    assert controller.min_interval_seconds == 120
+
+    controller.update(remaining=0, limit=60, reset_timestamp=NOW + 60,
+                      now=NOW)
+    assert controller.current_concurrency == 1
+    assert controller.min_interval_seconds == 60
+
+    # Quota has been reset.
+    controller.update(remaining=60, limit=60, reset_timestamp=NOW + 3600,
+                      now=NOW)
+    assert controller.current_concurrency == 1.5
+    assert controller.min_interval_seconds == 0
+
+
+def test_process_metadata():
+    # Response text copied from https://pvoutput.org/help.html#api-getsystem
+    response_text = (
+        "PVOutput Demo,2450,2199,14,175,Enertech,1,2000,CMS,N,10.0,No,"
+        "20100101,-33.907725,151.026108,5,0,0,,0.0;;0")
+    metadata = pvoutput._process_metadata(response_text)
+    assert metadata['name'] == 'PVOutput Demo'
+    assert metadata['system_AC_capacity_W'] == 2450
+    assert metadata['install_date'] == pd.Timestamp('2010-01-01')
+    assert metadata['latitude'] == -33.907725
+    assert pd.isnull(metadata['secondary_orientation'])
+    assert len(metadata) == 20
+    # Same types as pd.read_csv.
+    assert type(metadata['system_AC_capacity_W']) is np.int64
+    assert type(metadata['latitude']) is np.float64
+    assert type(metadata['secondary_orientation']) is np.float64
+
+
+@pytest.mark.parametrize('column', [0, 1, 11])  # name, AC capacity, shade
+@pytest.mark.parametrize('field', [
+    '1_000', ' 7', '7 ', 'NA', 'nan', 'inf', '1e3', '-.5', '+3', '0x10',
+    '99999999999999999999', 'True', 'FALSE', 'true', '"Quoted Name"',
+    '"7"', 'yes'])
+def test_process_metadata_edge_cases(column, field):
+    fields = (
+        "PVOutput Demo,2450,2199,14,175,Enertech,1,2000,CMS,N,10.0,No,"
+        "20100101,-33.907725,151.026108,5,0,0,,0.0").split(',')
+    fields[column] = field
+    response_text = ','.join(fields)
+    metadata = pvoutput._process_metadata(response_text)
+    expected = pd.read_csv(
+        StringIO(response_text), header=None, dtype={12: str}).iloc[0]
+    install_date_index = 12
+    for i, (value, expected_value) in enumerate(zip(metadata, expected)):
+        if i == install_date_index:
+            continue
+        assert type(value) is type(expected_value), metadata.index[i]
+        assert value == expected_value or (
+            pd.isnull(value) and pd.isnull(expected_value)), (
+                metadata.index[i])
+
+
+def test_process_statistic():
+    # Response text copied from
+    # https://pvoutput.org/help.html#api-getstatistic
+    response_text = (
+        "246800,246800,8226,2000,11400,3.358,30,20100901,20100930,4.653,"
+        "20100901")
+    stats = pvoutput._process_statistic(response_text, pv_system_id=123)
+    assert stats.index.tolist() == [123]
+    assert stats['total_energy_gen_Wh'].dtype == np.float32
+    assert stats['num_outputs'].iloc[0] == 30
+    assert stats['actual_date_to'].iloc[0] == pd.Timestamp('2010-09-30')
+
+    # pd.read_csv can't parse this as a float32, so neither should we.
+    with pytest.raises(ValueError):
+        pvoutput._process_statistic(
+            response_text.replace('246800', '246_800', 1), pv_system_id=123)
+
+    empty_stats = pvoutput._process_statistic('', pv_system_id=123)
+    assert empty_stats.index.tolist() == [123]
+    assert empty_stats['total_energy_gen_Wh'].dtype == np.float32
+    assert empty_stats.isnull().all(axis=None)
+
+
+class _FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def sleep(self, secs):
+        assert secs >= 0
+        self.now += secs
+
+
+def test_rate_controller_after_rate_limit_reset(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(pvoutput.time, 'monotonic', lambda: clock.now)
+    monkeypatch.setattr(pvoutput.time, 'sleep', clock.sleep)
+    controller = pvoutput._RateController()
+
+    # A request uses up the quota, and the reset is 3000 seconds away.
+    controller.acquire()
+    controller.update(remaining=0, limit=60, reset_timestamp=clock.now + 3000,
+                      now=clock.now)
+    # Wait for the reset (plus a safety margin), like _api_query does.
+    clock.sleep(3000 + 180)
+
+    # The retry shouldn't wait again...
+    start = clock.now
+    controller.acquire()
+    assert clock.now == start
+    controller.update(remaining=59, limit=60, reset_timestamp=clock.now + 3600,
+                      now=clock.now)
+
+    # ...and neither should the next request, now we have a fresh quota.
+    controller.acquire()
+    assert clock.now == start
+
+    # Whilst the quota is low, requests are spaced out.
+    controller.update(remaining=2, limit=60, reset_timestamp=clock.now + 100,
+                      now=clock.now)
+    controller.acquire()
+    assert clock.now == start + 50
+
+
+def _make_response(status_code, content, rate_limit_remaining):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update({
+        'X-Rate-Limit-Remaining': str(rate_limit_remaining),
+        'X-Rate-Limit-Limit': '60',
+        'X-Rate-Limit-Reset': '1546300800'})
+    return response
+
+
+def test_api_query_retries_after_rate_limit(monkeypatch):
+    pv = pvoutput.PVOutput(
+        api_key='key', system_id='1', data_service_url='https://pv.org')
+    responses = [
+        _make_response(403, b'Forbidden 403: Exceeded 60 requests', 0),
+        _make_response(403, b'Forbidden 403: Exceeded 60 requests', 0),
+        _make_response(200, b'hello', 59)]
+    monkeypatch.setattr(
+        pv, '_get_api_response', lambda service, params: responses.pop(0))
+    monkeypatch.setattr(pv, 'wait_for_rate_limit_reset', lambda: None)
+    assert pv._api_query(
+        'getstatus', {}, wait_if_rate_limit_exceeded=True) == 'hello'
+
+    responses.append(
+        _make_response(403, b'Forbidden 403: Exceeded 60 requests', 0))
+    with pytest.raises(pvoutput.RateLimitExceeded):
+        pv._api_query('getstatus', {}, wait_if_rate_limit_exceeded=False)
+
+
+def test_iter_status(monkeypatch):
+    pv = pvoutput.PVOutput(
+        api_key='key', system_id='1', data_service_url='https://pv.org')
+    monkeypatch.setattr(
+        pv, 'get_status',
+        lambda pv_system_id, date: pd.DataFrame({'id': [pv_system_id]}))
+    pairs = [(1, '20190101'), (2, '20190102')]
+    statuses = pv.iter_status(pairs)
+    assert not isinstance(statuses, list)
+    for (pv_system_id, date, status), pair in zip(statuses, pairs):
+        assert (pv_system_id, date) == pair
+        assert status['id'].iloc[0] == pv_system_id
+
+
+def test_set_rate_limit_params():
+    pv = pvoutput.PVOutput(
+        api_key='key', system_id='1', data_service_url='https://pv.org')
+    assert pv.rate_limit_reset_time is None
+    pv._set_rate_limit_params(
+        _make_response(200, b'', rate_limit_remaining=10).headers)
+    assert pv.rate_limit_info() == {
+        'rate_limit_remaining': 10,
+        'rate_limit_total': 60,
+        'rate_limit_reset_time': pd.Timestamp('2019-01-01', tz='UTC')}
+    # The reset time is in the past, so just wait for the safety margin.
+    assert pv._secs_to_wait_for_rate_limit() == 180
+
+
+def test_api_query_only_paces_if_happy_to_wait(monkeypatch):
+    pv = pvoutput.PVOutput(
+        api_key='key', system_id='1', data_service_url='https://pv.org')
+    acquire_calls = []
+    monkeypatch.setattr(
+        pv._rate_controller, 'acquire', lambda: acquire_calls.append(1))
+    monkeypatch.setattr(
+        pv, '_get_api_response',
+        lambda service, params: _make_response(200, b'hello', 1))
+
+    assert pv._api_query('getstatus', {}) == 'hello'
+    assert acquire_calls == []
+
+    assert pv._api_query(
+        'getstatus', {}, wait_if_rate_limit_exceeded=True) == 'hello'
+    assert acquire_calls == [1]
+
+
+def test_iter_status_async_bounds_pending_queries(monkeypatch):
+    MAX_CONCURRENCY = 3
+    pv = pvoutput.PVOutput(
+        api_key='key', system_id='1', data_service_url='https://pv.org')
+    started = []
+    settled = []
+
+    async def _get_status(pv_system_id, date):
+        started.append(pv_system_id)
+        try:
+            await asyncio.sleep(0.001 * (pv_system_id % 4))
+        finally:
+            settled.append(pv_system_id)
+        return pd.DataFrame({'id': [pv_system_id]})
+
+    @contextlib.asynccontextmanager
+    async def _session(max_concurrency):
+        yield None
+
+    monkeypatch.setattr(pvoutput, '_get_aiohttp_session', _session)
+    monkeypatch.setattr(
+        pv, '_make_async_status_getter', lambda *args: _get_status)
+
+    async def _consume_some():
+        statuses = pv.iter_status_async(
+            ((i, '20190101') for i in range(100)),
+            max_concurrency=MAX_CONCURRENCY)
+        num_yielded = 0
+        async for pv_system_id, _, status in statuses:
+            num_yielded += 1
+            assert status['id'].iloc[0] == pv_system_id
+            assert len(started) - num_yielded < MAX_CONCURRENCY
+            if num_yielded == 10:
+                break
+        await statuses.aclose()
+        return num_yielded
+
+    assert asyncio.run(_consume_some()) == 10
+    assert len(started) < 10 + MAX_CONCURRENCY
+    # Queries still pending were cancelled and awaited by aclose().
+    assert sorted(settled) == sorted(started)
+
+
+def test_get_status_many_async_pauses_for_rate_limit(
+        monkeypatch, stub_aiohttp_session, stub_aiohttp_response):
+    pytest.importorskip('aiohttp')
+    pv = pvoutput.PVOutput(
+        api_key='key', system_id='1', data_service_url='https://pv.org')
+    rate_limit_headers = {
+        'X-Rate-Limit-Remaining': '0',
+        'X-Rate-Limit-Limit': '60',
+        'X-Rate-Limit-Reset': '1546300800'}
+    forbidden = stub_aiohttp_response(
+        403, b'Forbidden 403: Exceeded 60 requests', rate_limit_headers)
+    ok_headers = dict(rate_limit_headers, **{'X-Rate-Limit-Remaining': '59'})
+    responses = [forbidden] * 3 + [
+        stub_aiohttp_response(
+            200, '20190101,00:05,{},0,NaN,60,0,NaN,NaN,5,240'.format(
+                i).encode(), ok_headers)
+        for i in range(4)]
+    session = stub_aiohttp_session(responses)
+    monkeypatch.setattr(
+        pvoutput, '_get_aiohttp_session', lambda max_concurrency: session)
+    secs_to_wait_calls = []
+
+    def _secs_to_wait_for_rate_limit():
+        secs_to_wait_calls.append(None)
+        return 0
+
+    monkeypatch.setattr(
+        pv, '_secs_to_wait_for_rate_limit', _secs_to_wait_for_rate_limit)
+
+    pairs = [(i, '20190101') for i in range(4)]
+    statuses = pv.get_status_many(
+        pairs, max_concurrency=4, wait_if_rate_limit_exceeded=True)
+    assert session.num_requests == 7
+    # Only the first query to see the 403 waits for the reset; the other
+    # queries are paused until it's done.
+    assert len(secs_to_wait_calls) == 1
+    assert sorted(
+        status['cumulative_energy_gen_Wh'].iloc[0]
+        for status in statuses) == [0, 1, 2, 3]
+
+    session.responses = [forbidden]
+    with pytest.raises(pvoutput.RateLimitExceeded):
+        pv.get_status_many(pairs[:1], wait_if_rate_limit_exceeded=False)
+
+    fast_parse_args = []
+    process_status = pvoutput._process_status
+
+    def _process_status(content, fast_parse=True):
+        fast_parse_args.append(fast_parse)
+        return process_status(content, fast_parse=fast_parse)
+
+    monkeypatch.setattr(pvoutput, '_process_status', _process_status)
+    session.responses = [stub_aiohttp_response(
+        200, b'20190101,00:05,0,0,NaN,60,0,NaN,NaN,5,240', ok_headers)]
+    pv.get_status_many(pairs[:1], fast_parse=False)
+    assert fast_parse_args == [False]
+
+
+def test_is_gil_enabled(monkeypatch):
+    monkeypatch.delattr(pvoutput.sys, '_is_gil_enabled', raising=False)
+    assert pvoutput._is_gil_enabled()
+    monkeypatch.setattr(
+        pvoutput.sys, '_is_gil_enabled', lambda: False, raising=False)
+    assert not pvoutput._is_gil_enabled()
+
+
+@pytest.mark.parametrize('gil_enabled', [True, False])
+def test_get_status_many_threaded(monkeypatch, gil_enabled):
+    pv = pvoutput.PVOutput(
+        api_key='key', system_id='1', data_service_url='https://pv.org')
+    monkeypatch.setattr(pvoutput, '_is_gil_enabled', lambda: gil_enabled)
+    main_thread = threading.get_ident()
+    parse_threads = set()
+    process_status = pvoutput._process_status
+
+    def _process_status(content, **kwargs):
+        parse_threads.add(threading.get_ident())
+        return process_status(content, **kwargs)
+
+    def _get_status_content(pv_system_id, date):
+        # Finish out of order, to check the results are still in order.
+        time.sleep(0.001 * (pv_system_id % 3))
+        if pv_system_id == 3:
+            return b''
+        return '{},00:05,{},0,NaN,60,0,NaN,NaN,5,240'.format(
+            date, pv_system_id).encode()
+
+    monkeypatch.setattr(pvoutput, '_process_status', _process_status)
+    monkeypatch.setattr(pv, '_get_status_content', _get_status_content)
+    pairs = [(i, '201901{:02d}'.format(i)) for i in range(1, 9)]
+    statuses = pv.get_status_many_threaded(pairs, max_workers=4)
+    assert len(statuses) == len(pairs)
+    for status, (pv_system_id, date) in zip(statuses, pairs):
+        if pv_system_id == 3:
+            assert status.empty
+        else:
+            assert status.index[0] == pd.Timestamp(date + ' 00:05')
+            assert status['cumulative_energy_gen_Wh'].iloc[0] == pv_system_id
+    # With the GIL, the parsing should all happen in the calling thread.
+    assert (parse_threads == {main_thread}) == gil_enabled
@@ -1,10 +1,13 @@
 import os
+import asyncio
 import inspect
+import pytest
 import numpy as np
 import pandas as pd
 from pvoutput import utils
 from pvoutput.daterange import DateRange
 from datetime import date
+from concurrent.futures import ThreadPoolExecutor
 
 
 def data_dir():
@@ -55,3 +58,80 @@ def test_datetime_list_to_dates():
         utils.datetime_list_to_dates([
             pd.Timestamp("2019-01-01"), pd.Timestamp("2019-01-02")]),
         [date(2019, 1, 1), date(2019, 1, 2)])
+
+
+def test_get_session():
+    session = utils._get_session()
+    assert utils._get_session() is session
+    assert session.headers['Connection'] == 'keep-alive'
+
+
+def test_get_session_from_many_threads(monkeypatch):
+    monkeypatch.setattr(utils, '_SESSION', None)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        sessions = list(
+            executor.map(lambda _: utils._get_session(), range(64)))
+    assert all(session is sessions[0] for session in sessions)
+
+
+def test_get_api_url():
+    assert (
+        utils._get_api_url('https://pvoutput.org', 'getstatus') ==
+        'https://pvoutput.org/service/r2/getstatus.jsp')
+
+
+def test_get_session_retries_on_429():
+    adapter = utils._get_session().get_adapter('https://pvoutput.org')
+    assert 429 in adapter.max_retries.status_forcelist
+    assert adapter.max_retries.respect_retry_after_header
+
+
+def test_get_response_async_retries(
+        monkeypatch, stub_aiohttp_session, stub_aiohttp_response):
+    aiohttp = pytest.importorskip('aiohttp')
+    secs_waited = []
+
+    async def _sleep(secs):
+        secs_waited.append(secs)
+
+    monkeypatch.setattr(utils.asyncio, 'sleep', _sleep)
+    session = stub_aiohttp_session([
+        stub_aiohttp_response(502),
+        stub_aiohttp_response(429, headers={'Retry-After': '7'}),
+        stub_aiohttp_response(0, aiohttp.ServerDisconnectedError()),
+        stub_aiohttp_response(0, asyncio.TimeoutError()),
+        stub_aiohttp_response(200, b'hello', {'X-Rate-Limit-Limit': '60'})])
+    response = asyncio.run(utils._get_response_async(
+        session, 'https://pvoutput.org', {}, {}))
+    assert response.status_code == 200
+    assert response.content == b'hello'
+    assert response.headers['x-rate-limit-limit'] == '60'
+    assert session.num_requests == 5
+    # Same backoff as urllib3, except where Retry-After says otherwise.
+    assert secs_waited == [0, 7, 2, 4]
+
+
+def test_get_response_async_gives_up(
+        monkeypatch, stub_aiohttp_session, stub_aiohttp_response):
+    aiohttp = pytest.importorskip('aiohttp')
+
+    async def _sleep(secs):
+        pass
+
+    monkeypatch.setattr(utils.asyncio, 'sleep', _sleep)
+    num_status_retries = utils._MAX_RETRY_COUNTS['status']
+    session = stub_aiohttp_session(
+        [stub_aiohttp_response(503)] * (num_status_retries + 2))
+    response = asyncio.run(utils._get_response_async(
+        session, 'https://pvoutput.org', {}, {}))
+    assert response.status_code == 503
+    assert session.num_requests == num_status_retries + 1
+
+    num_read_retries = utils._MAX_RETRY_COUNTS['read']
+    session = stub_aiohttp_session(
+        [stub_aiohttp_response(0, aiohttp.ServerDisconnectedError())] *
+        (num_read_retries + 2))
+    with pytest.raises(aiohttp.ServerDisconnectedError):
+        asyncio.run(utils._get_response_async(
+            session, 'https://pvoutput.org', {}, {}))
+    assert session.num_requests == num_read_retries + 1
@@ -1,12 +1,16 @@
 import warnings
+import asyncio
 import tables
 import os
 import logging
+import functools
 import sys
+import threading
 from typing import Dict, Union, List, Iterable
 import requests
 from urllib3.util.retry import Retry
 from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 import yaml
 from pvoutput.consts import CONFIG_FILENAME
 from pvoutput.daterange import get_date_range_list, DateRange
@@ -33,7 +37,19 @@ def _get_param_from_config_file(param_name, config_filename=CONFIG_FILENAME):
 def get_logger(filename=None,
                mode='a',
                level=logging.DEBUG,
-               stream_handler=False):
+               stream_handler=False,
+               attach_requests_loggers=False):
+    """Configure the `pvoutput` logger to log to `filename`.
+
+    The pvoutput library doesn't log anywhere until this is called (or until
+    you add your own handlers to the `pvoutput` logger).
+
+    Args:
+        filename: Defaults to `log_filename` from the config file.
+        attach_requests_loggers: If True then the `urllib3` and `requests`
+            loggers will also log to our handlers.  This logs several lines
+            per API request.
+    """
     if filename is None:
         filename = _get_param_from_config_file('log_filename')
     logger = logging.getLogger('pvoutput')
@@ -46,52 +62,190 @@ def get_logger(filename=None,
     for handler in logger.handlers:
         handler.setFormatter(formatter)
 
-    # Attach urllib3's logger to our logger.
-    loggers_to_attach = ['urllib3', 'requests']
-    for logger_name_to_attach in loggers_to_attach:
-        logger_to_attach = logging.getLogger(logger_name_to_attach)
-        logger_to_attach.parent = logger
-        logger_to_attach.propagate = True
+    if attach_requests_loggers:
+        # Attach urllib3's logger to our logger.
+        loggers_to_attach = ['urllib3', 'requests']
+        for logger_name_to_attach in loggers_to_attach:
+            logger_to_attach = logging.getLogger(logger_name_to_attach)
+            logger_to_attach.parent = logger
+            logger_to_attach.propagate = True
 
     return logger
 
 
-def _get_session_with_retry() -> requests.Session:
-    max_retry_counts = dict(
-        connect=720,  # How many connection-related errors to retry on.
-                      # Set high because sometimes the network goes down for a
-                      # few hours at a time.
-                      # 720 x Retry.MAX_BACKOFF (120 s) = 86,400 s = 24 hrs
-        read=20,  # How many times to retry on read errors.
-        status=20  # How many times to retry on bad status codes.
-    )
-    retries = Retry(
-        total=max(max_retry_counts.values()),
-        backoff_factor=0.5,
-        status_forcelist=[500, 502, 503, 504],
-        **max_retry_counts
-    )
-    session = requests.Session()
-    session.mount('http://', HTTPAdapter(max_retries=retries))
-    session.mount('https://', HTTPAdapter(max_retries=retries))
-    return session
+_MAX_RETRY_COUNTS = dict(
+    connect=720,  # How many connection-related errors to retry on.
+                  # Set high because sometimes the network goes down for a
+                  # few hours at a time.
+                  # 720 x Retry.MAX_BACKOFF (120 s) = 86,400 s = 24 hrs
+    read=20,  # How many times to retry on read errors.
+    status=20  # How many times to retry on bad status codes.
+)
+_RETRY = Retry(
+    total=max(_MAX_RETRY_COUNTS.values()),
+    backoff_factor=0.5,
+    # Let urllib3 retry '429 Too Many Requests', sleeping for as long as
+    # the Retry-After header asks.  PVOutput.org signals that the hourly
+    # quota is used up with '403 Forbidden' and X-Rate-Limit-Reset,
+    # which can mean waiting for up to an hour, so that's still
+    # handled by PVOutput._api_query.
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=frozenset(['GET']),
+    respect_retry_after_header=True,
+    **_MAX_RETRY_COUNTS
+)
+
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Returns a module-level Session, creating it on first use.
+
+    Re-using a single Session means connections to PVOutput.org are kept
+    alive and re-used across API requests, rather than paying for a new
+    TCP + TLS handshake on every request.  Safe to call from several
+    threads at once, e.g. from PVOutput.get_status_many_threaded().
+    """
+    global _SESSION
+    if _SESSION is not None:
+        return _SESSION
+
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            session.headers['Connection'] = 'keep-alive'
+            adapter = HTTPAdapter(
+                max_retries=_RETRY, pool_connections=1, pool_maxsize=32,
+                pool_block=False)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _SESSION = session
+    return _SESSION
+
+
+@functools.lru_cache()
+def _get_api_url(base_url: str, service: str) -> str:
+    """
+    Args:
+        base_url: e.g. 'https://pvoutput.org'
+        service: string, e.g. 'search', 'getstatus'
+    """
+    return os.path.join(base_url, 'service/r2/{}.jsp'.format(service))
 
 
 def _get_response(
         api_url: str,
         api_params: Dict,
         headers: Dict) -> requests.Response:
-    api_params_str = '&'.join(
-        ['{}={}'.format(key, value) for key, value in api_params.items()])
-    full_api_url = '{}?{}'.format(api_url, api_params_str)
-    session = _get_session_with_retry()
-    response = session.get(full_api_url, headers=headers)
+    response = _get_session().get(
+        api_url, params=api_params, headers=headers)
     _LOG.debug(
         'response: status_code=%d; headers=%s',
         response.status_code, response.headers)
     return response
 
 
+def _get_aiohttp_session(max_concurrency: int = 16):
+    """Returns a new aiohttp.ClientSession.  Must be called from within a
+    running event loop.  aiohttp is an optional dependency, only required
+    for the async API.
+    """
+    try:
+        import aiohttp
+    except ImportError as e:
+        raise ImportError(
+            'aiohttp is required for the async API.'
+            '  Install it with `pip install aiohttp`.  {}'.format(e))
+    connector = aiohttp.TCPConnector(
+        limit=max_concurrency, keepalive_timeout=30)
+    return aiohttp.ClientSession(connector=connector)
+
+
+async def _get_response_async(
+        session,
+        api_url: str,
+        api_params: Dict,
+        headers: Dict) -> requests.Response:
+    """Async version of _get_response().
+
+    aiohttp doesn't retry, so this retries connection errors, read errors
+    and the status codes in `_RETRY.status_forcelist`, up to the same
+    counts and with the same backoff as `_RETRY` uses for _get_response().
+
+    Args:
+        session: aiohttp.ClientSession, from _get_aiohttp_session().
+
+    Returns:
+        requests.Response built from the aiohttp response, so the response
+        can be processed exactly like a response from _get_response().
+        If the retries for bad status codes are used up then the last
+        response is returned.
+    """
+    import aiohttp
+    retry_counts = dict(_MAX_RETRY_COUNTS)
+    total_retries = 0
+    while True:
+        try:
+            async with session.get(
+                    api_url, params=api_params,
+                    headers=headers) as aio_response:
+                content = await aio_response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error_type = (
+                'connect' if isinstance(e, aiohttp.ClientConnectorError)
+                else 'read')
+            if (retry_counts[error_type] <= 0 or
+                    total_retries >= _RETRY.total):
+                raise
+            retry_counts[error_type] -= 1
+            total_retries += 1
+            secs_to_wait = _get_backoff_time(total_retries)
+            _LOG.warning(
+                'Retrying (%d) after %s error: %r.  Waiting %.1f seconds.',
+                total_retries, error_type, e, secs_to_wait)
+            await asyncio.sleep(secs_to_wait)
+            continue
+
+        response = requests.Response()
+        response.status_code = aio_response.status
+        response.reason = aio_response.reason
+        response.headers = CaseInsensitiveDict(aio_response.headers)
+        response.url = str(aio_response.url)
+        response._content = content
+        _LOG.debug(
+            'response: status_code=%d; headers=%s',
+            response.status_code, response.headers)
+
+        if (response.status_code not in _RETRY.status_forcelist or
+                retry_counts['status'] <= 0 or
+                total_retries >= _RETRY.total):
+            return response
+        retry_counts['status'] -= 1
+        total_retries += 1
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is None:
+            secs_to_wait = _get_backoff_time(total_retries)
+        else:
+            secs_to_wait = _RETRY.parse_retry_after(retry_after)
+        _LOG.warning(
+            'Retrying (%d) after status code %d.  Waiting %.1f seconds.',
+            total_retries, response.status_code, secs_to_wait)
+        await asyncio.sleep(secs_to_wait)
+
+
+def _get_backoff_time(num_retries: int) -> float:
+    """Same backoff as urllib3 uses for `_RETRY`, after `num_retries`
+    consecutive errors."""
+    if num_retries <= 1:
+        return 0
+    backoff_max = getattr(Retry, 'DEFAULT_BACKOFF_MAX', None)
+    if backoff_max is None:  # urllib3 < 2
+        backoff_max = Retry.BACKOFF_MAX
+    return min(_RETRY.backoff_factor * 2 ** (num_retries - 1), backoff_max)
+
+
 def _print_and_log(msg: str, level: int = logging.INFO):
     _LOG.log(level, msg)
     print(msg)
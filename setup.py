@@ -11,8 +11,11 @@ setup(
         'pandas',
         'matplotlib',
         'jupyter',
-        'urllib3',
+        'urllib3>=1.26',
         'requests',
         'beautifulsoup4'
-    ]
+    ],
+    extras_require={
+        'async': ['aiohttp']
+    }
 )